@@ -1,15 +1,23 @@
 # supabase_helpers.py (patched to avoid header type error on upload)
 from __future__ import annotations
 import os, datetime as dt
+from functools import lru_cache
 from typing import List, Dict, Optional
 from supabase import create_client, Client
 
 MIME_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
+@lru_cache(maxsize=None)
+def _cached_client(url: str, key: str) -> Client:
+    return create_client(url, key)
+
 def sb_client() -> Client:
+    # Reuse one client per (url, key) for the life of the process; creating a
+    # fresh client per call paid connection/TLS setup on every operation and
+    # chewed through the pooler's connection budget under Streamlit reruns.
     url = os.environ["SUPABASE_URL"].strip()
     key = os.environ["SUPABASE_SERVICE_KEY"].strip()
-    return create_client(url, key)
+    return _cached_client(url, key)
 
 def _iso_date(v):
     if v is None: return None
@@ -33,19 +41,28 @@ def add_time_rows(rows: List[Dict], created_by: str) -> int:
     res = sb.table("time_entries").insert(rows2).execute()
     return len(res.data or [])
 
-def fetch_time_entries_for_date(date_str: str, job_number: Optional[str]=None) -> list[dict]:
+def fetch_time_entries_for_date(date_str: str, job_number: Optional[str]=None,
+                                nonzero_hours: bool=False) -> list[dict]:
     sb = sb_client()
     q = sb.table("time_entries").select("*").eq("date", date_str)
     if job_number:
         q = q.eq("job_number", str(job_number))
+    if nonzero_hours:
+        # let PostgREST drop zero-hour rows so they never cross the wire
+        q = q.or_("rt_hours.gt.0,ot_hours.gt.0")
     out = q.order("created_at", desc=False).execute()
     return out.data or []
 
 def delete_by_ids(ids: List[str]) -> int:
     if not ids: return 0
     sb = sb_client()
-    res = sb.table("time_entries").delete().in_("id", ids).execute()
-    return len(res.data or [])
+    # PostgREST encodes .in_ filters in the URL; chunk so huge id lists don't
+    # blow past URL length limits.
+    deleted = 0
+    for i in range(0, len(ids), 1000):
+        res = sb.table("time_entries").delete().in_("id", ids[i:i+1000]).execute()
+        deleted += len(res.data or [])
+    return deleted
 
 def upload_export_bytes(content: bytes, path: str, expires_seconds: int = 86400) -> str:
     """
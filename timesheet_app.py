@@ -20,7 +20,7 @@
 # Requirements: streamlit, pandas, openpyxl, xlsxwriter
 # SharePoint (optional): office365-rest-python-client and valid SP_* secrets
 
-import os, io, json, datetime as dt
+import os, io, json, functools, tempfile, datetime as dt
 from datetime import datetime, date
 from pathlib import Path
 from typing import Dict, List
@@ -32,6 +32,14 @@ from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.styles import Font
 
+# openpyxl silently uses lxml's C parser when it's installed; without it every
+# template load/save falls back to the slower stdlib ElementTree.
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except Exception:
+    HAS_LXML = False
+
 # ---- Optional SharePoint helper ----
 USE_SHAREPOINT = bool(os.environ.get("SP_SITE")) and bool(os.environ.get("CLIENT_ID"))
 if USE_SHAREPOINT:
@@ -57,14 +65,19 @@ for k, v in {
         st.session_state[k] = v
 
 # ---------- Landing page ----------
-def show_landing():
+@st.cache_resource
+def _landing_logo():
+    # glob + read once per process; st.image re-decodes the file on every render otherwise
     jpgs = sorted(APP_DIR.glob("*.jpg"))
-    logo_path = str(jpgs[0]) if jpgs else None
+    return jpgs[0].read_bytes() if jpgs else None
+
+def show_landing():
+    logo_bytes = _landing_logo()
 
     st.markdown("<div style='height:5vh'></div>", unsafe_allow_html=True)
     left, mid, right = st.columns([1,2,1])
     with mid:
-        if logo_path: st.image(logo_path, width=300)
+        if logo_bytes: st.image(logo_bytes, width=300)
         st.markdown("<div style='height:0.5rem'></div>", unsafe_allow_html=True)
         email = st.text_input("Your work email", st.session_state.get("whoami_email",""), placeholder="name@ptwenergy.com")
         if st.button("Enter"):
@@ -77,7 +90,7 @@ def show_landing():
                 try:
                     p = sidecar.read_text().strip()
                     if p: default_xlsx = p
-                except Exception: pass
+                except OSError: pass
             st.session_state["xlsx_path"] = default_xlsx
             st.rerun()
 
@@ -93,26 +106,61 @@ with st.sidebar:
     st.caption("Excel‑first. Exports saved locally and uploaded to SharePoint if SP_* secrets are present.")
     st.code(xlsx_path)
     st.text_input("Your work email", key="whoami_email")
+    if not HAS_LXML:
+        st.caption("Tip: install `lxml` for faster Excel reads/writes.")
 
 # ---------- Helpers ----------
 def _clean_headers(df: pd.DataFrame) -> pd.DataFrame:
-    try: df.columns = [str(c).strip() for c in df.columns]
+    try:
+        cleaned = [str(c).strip() for c in df.columns]
+        if list(df.columns) != cleaned:  # skip the index rebuild when already clean
+            df.columns = cleaned
     except Exception: pass
     return df
 
 def _first(cols, names):
-    s = {str(c) for c in cols}
+    # accepts a prebuilt set so repeated lookups on the same frame share one allocation
+    s = cols if isinstance(cols, (set, frozenset)) else {str(c) for c in cols}
     for n in names:
         if n in s: return n
     return None
 
+TRUTHY = frozenset({"true","t","yes","y","1","active","enabled"})
+
+PAYCODE_MAP = {"REG": "211", "OT": "212", "SUBSISTENCE": "261"}
+
+@functools.lru_cache(maxsize=4096)
 def _pad_job_area(v) -> str:
+    # called per row in exports; area codes repeat heavily so memoizing pays off
     s = str(v).strip()
     return f"{int(s):03d}" if s.isdigit() else s
 
-def _read_sheet(path: str, sheet: str, empty_cols: List[str]) -> pd.DataFrame:
+def pad_job_area_series(s: pd.Series) -> pd.Series:
+    # vectorized counterpart of _pad_job_area for bulk paths
+    s = s.astype(str).str.strip()
+    return s.str.zfill(3).where(s.str.isdigit(), s)
+
+# Streaming read settings for openpyxl: skips the full in-memory workbook model
+# (styles, formulas, links) that the default load builds for every sheet read.
+_OPENPYXL_FAST = {"read_only": True, "data_only": True, "keep_links": False}
+
+# Prefer the Rust-based calamine parser for plain tabular reads; it's several
+# times faster than openpyxl. Writers still use openpyxl (calamine is read-only).
+try:
+    import python_calamine  # noqa: F401
+    _READ_ENGINE_KW = {"engine": "calamine"}
+except ImportError:
+    _READ_ENGINE_KW = {"engine": "openpyxl", "engine_kwargs": _OPENPYXL_FAST}
+
+# Canonical Time Data layout; reads are scoped to these so stray helper columns
+# in the sheet don't get parsed into every preview/export frame.
+TIME_DATA_COLUMNS = ["Job Number","Job Area","Date","Name","Class Type","Trade Class","Employee Number",
+                     "RT Hours","OT Hours","Night Shift","Premium Rate / Subsistence Rate / Travel Rate","Comments"]
+
+def _read_sheet(path: str, sheet: str, empty_cols: List[str], usecols=None) -> pd.DataFrame:
     try:
-        df = pd.read_excel(path, sheet_name=sheet); _clean_headers(df); return df
+        df = pd.read_excel(path, sheet_name=sheet, usecols=usecols, **_READ_ENGINE_KW)
+        _clean_headers(df); return df
     except Exception:
         return pd.DataFrame(columns=empty_cols)
 
@@ -121,175 +169,268 @@ if not os.path.exists(xlsx_path):
     st.error("Workbook not found. Place 'TimeSheet Apps.xlsx' next to the app OR create 'timesheet_default_path.txt' with its full path.")
     st.stop()
 
-employees = _read_sheet(xlsx_path, "Employee List", ["Employee Name","Employee Number","Override Trade Class"])
-jobs      = _read_sheet(xlsx_path, "Job Numbers",    ["JOB #","AREA #","DESCRIPTION"])
-costcodes = _read_sheet(xlsx_path, "Cost Codes",     ["Cost Code","Cost Code Description","Active"])
-timedata  = _read_sheet(xlsx_path, "Time Data",      ["Job Number","Job Area","Date","Name","Class Type","Trade Class","Employee Number","RT Hours","OT Hours","Night Shift","Premium Rate / Subsistence Rate / Travel Rate","Comments"])
-
-emp_name_col=_first(employees.columns, ["Employee Name","Name"])
-emp_num_col =_first(employees.columns, ["Person Number","Employee Number","Emp #"])
-emp_trade_col=_first(employees.columns, ["Override Trade Class","Trade Class"])
-job_num_col=_first(jobs.columns, ["JOB #","Job Number","Job #"])
-job_area_col=_first(jobs.columns, ["AREA #","Job Area","Area #"])
-job_desc_col=_first(jobs.columns, ["DESCRIPTION","Area Description","Description","Area Name"])
-cost_code_col=_first(costcodes.columns, ["Cost Code","Class Type"])
-paycode_map = {"REG":"211","OT":"212","SUBSISTENCE":"261"}
+_LOOKUP_SHEETS = {
+    "Employee List": ("Employee Name","Employee Number","Override Trade Class"),
+    "Job Numbers":   ("JOB #","AREA #","DESCRIPTION"),
+    "Cost Codes":    ("Cost Code","Cost Code Description","Active"),
+}
+
+@st.cache_data(show_spinner=False)
+def _load_lookup_sheets(path: str, mtime: float) -> Dict[str, pd.DataFrame]:
+    # mtime is part of the cache key so edits to the workbook invalidate the entry.
+    # One ExcelFile parses the zip/XML container once for all three lookup sheets;
+    # separate pd.read_excel calls each re-parsed the whole workbook.
+    try:
+        with pd.ExcelFile(path, **_READ_ENGINE_KW) as xl:
+            out = {}
+            for sheet, empty_cols in _LOOKUP_SHEETS.items():
+                try:
+                    df = xl.parse(sheet)
+                    _clean_headers(df)
+                except Exception:
+                    df = pd.DataFrame(columns=list(empty_cols))
+                out[sheet] = df
+            return out
+    except Exception:
+        return {s: pd.DataFrame(columns=list(c)) for s, c in _LOOKUP_SHEETS.items()}
+
+def _load_lookup_sheet(path: str, sheet: str, empty_cols: tuple, mtime: float) -> pd.DataFrame:
+    return _load_lookup_sheets(path, mtime).get(sheet, pd.DataFrame(columns=list(empty_cols)))
+
+def _lookup_sheet(sheet: str, empty_cols: List[str]) -> pd.DataFrame:
+    try: mtime = os.path.getmtime(xlsx_path)
+    except OSError: mtime = 0.0
+    return _load_lookup_sheet(xlsx_path, sheet, tuple(empty_cols), mtime)
+
+employees = _lookup_sheet("Employee List", ["Employee Name","Employee Number","Override Trade Class"])
+jobs      = _lookup_sheet("Job Numbers",    ["JOB #","AREA #","DESCRIPTION"])
+costcodes = _lookup_sheet("Cost Codes",     ["Cost Code","Cost Code Description","Active"])
+
+emp_cols  = set(map(str, employees.columns))
+job_cols  = set(map(str, jobs.columns))
+cost_cols = set(map(str, costcodes.columns))
+emp_name_col=_first(emp_cols, ["Employee Name","Name"])
+emp_num_col =_first(emp_cols, ["Person Number","Employee Number","Emp #"])
+emp_trade_col=_first(emp_cols, ["Override Trade Class","Trade Class"])
+job_num_col=_first(job_cols, ["JOB #","Job Number","Job #"])
+job_area_col=_first(job_cols, ["AREA #","Job Area","Area #"])
+job_desc_col=_first(job_cols, ["DESCRIPTION","Area Description","Description","Area Name"])
+cost_code_col=_first(cost_cols, ["Cost Code","Class Type"])
 
 # ---------- Entry UI ----------
 st.subheader("Timesheet Entry")
 date_val = st.date_input("Date", dt.date.today())
 
+def _build_emp_lookup(df: pd.DataFrame, name_col, num_col, trade_col) -> Dict[str, Dict[str, str]]:
+    if not name_col: return {}
+    nums   = df[num_col]   if num_col   else [""] * len(df)
+    trades = df[trade_col] if trade_col else [""] * len(df)
+    return {str(n): {"num": v, "trade": t} for n, v, t in zip(df[name_col].astype(str), nums, trades)}
+
+@st.cache_data(show_spinner=False)
+def _emp_lookup_cached(path: str, mtime: float, name_col, num_col, trade_col) -> Dict[str, Dict[str, str]]:
+    df = _load_lookup_sheet(path, "Employee List", ("Employee Name","Employee Number","Override Trade Class"), mtime)
+    return _build_emp_lookup(df, name_col, num_col, trade_col)
+
+try: _emp_mtime = os.path.getmtime(xlsx_path)
+except OSError: _emp_mtime = 0.0
+emp_lookup = _emp_lookup_cached(xlsx_path, _emp_mtime, emp_name_col, emp_num_col, emp_trade_col)
+
 emp_opts = employees[emp_name_col].astype(str).tolist() if emp_name_col else []
-sel_emps = st.multiselect("Employees", emp_opts)
 
 job_opts = jobs[job_num_col].astype(str).unique().tolist() if job_num_col else []
 sel_job  = st.selectbox("Job Number", [""] + job_opts)
 
 # Areas tied to chosen job
+@st.cache_data(show_spinner=False)
+def _area_options_cached(path: str, mtime: float, job: str, num_col, area_col, desc_col):
+    df = _load_lookup_sheet(path, "Job Numbers", ("JOB #","AREA #","DESCRIPTION"), mtime)
+    df = df.loc[df[num_col].astype(str) == str(job)]
+    codes = pad_job_area_series(df[area_col].fillna(""))
+    if desc_col:
+        descs = df[desc_col].fillna("").astype(str).str.strip()
+        labs = codes.where(descs.eq(""), codes + " - " + descs)
+    else:
+        labs = codes
+    keep = codes.ne("") & ~labs.duplicated()
+    return labs[keep].tolist(), dict(zip(labs[keep], codes[keep]))
+
 area_labels, area_map = [], {}
 if sel_job and job_area_col:
-    df = jobs.loc[jobs[job_num_col].astype(str)==str(sel_job)].copy(); _clean_headers(df)
-    for _, r in df.iterrows():
-        code = _pad_job_area(r.get(job_area_col,""))
-        desc = str(r.get(job_desc_col,"") or "").strip()
-        lab = f"{code} - {desc}" if desc else code
-        if lab not in area_map: area_labels.append(lab); area_map[lab]=code
-sel_area_label = st.selectbox("Job Area", [""] + area_labels)
-sel_area_code = area_map.get(sel_area_label, "")
+    area_labels, area_map = _area_options_cached(xlsx_path, _emp_mtime, sel_job,
+                                                 job_num_col, job_area_col, job_desc_col)
 
 # Active cost codes only
 def _only_active_costcodes(df: pd.DataFrame) -> pd.DataFrame:
-    df2 = df.copy(); _clean_headers(df2)
-    active_col = _first(df2.columns, ["Active","Is Active","Enabled","ACTIVE","IS ACTIVE","ENABLED"])
+    # headers are stripped in _read_sheet; filtering only reads, so no copy needed
+    df2 = df
+    cols = set(map(str, df2.columns))
+    active_col = _first(cols, ["Active","Is Active","Enabled","ACTIVE","IS ACTIVE","ENABLED"])
     if active_col:
-        def _truthy(x):
-            if isinstance(x, bool): return x
-            s = str(x).strip().lower()
-            return s in {"true","t","yes","y","1","active","enabled"}
-        return df2[df2[active_col].apply(_truthy)]
-    status_col = _first(df2.columns, ["Status","STATUS"])
+        s = df2[active_col]
+        if s.dtype == bool:
+            return df2[s]
+        # vectorized truthiness; str(True) -> "true" so bools in object columns still match
+        mask = s.astype(str).str.strip().str.lower().isin(TRUTHY)
+        return df2[mask]
+    status_col = _first(cols, ["Status","STATUS"])
     if status_col:
         return df2[df2[status_col].astype(str).str.strip().str.lower() == "active"]
-    end_col = _first(df2.columns, ["End Date","Inactive Date","Date End","END DATE"])
+    end_col = _first(cols, ["End Date","Inactive Date","Date End","END DATE"])
     if end_col:
         return df2[(df2[end_col].isna()) | (df2[end_col].astype(str).str.strip() == "")]
     return df2
-active_costcodes = _only_active_costcodes(costcodes)
 
 def build_cost_labels(df, code_col):
-    df2=df.copy(); _clean_headers(df2)
+    df2 = df  # read-only; headers already clean from _read_sheet
+    if not code_col or df2.empty: return [], {}
     desc_col = _first(df2.columns, ["Cost Code Description","Class Type Description","Description","Cost Code Name","Name"])
-    labels, mapping = [], {}
-    for _, r in df2.iterrows():
-        code = str(r.get(code_col,"") or "").strip()
-        if not code: continue
-        desc = str(r.get(desc_col,"") or "").strip() if desc_col else ""
-        lab = f"{code} - {desc}" if desc else code
-        if lab not in mapping: labels.append(lab); mapping[lab]=code
-    return labels, mapping
-
-code_labels, code_map = build_cost_labels(active_costcodes, cost_code_col)
-sel_code_label = st.selectbox("Class Type (Cost Code)", [""] + code_labels)
-sel_code_code = code_map.get(sel_code_label, "")
-
-rt_hours = st.number_input("RT Hours (per employee)", min_value=0.0, max_value=24.0, step=0.5, value=0.0)
-ot_hours = st.number_input("OT Hours (per employee)", min_value=0.0, max_value=24.0, step=0.5, value=0.0)
-desc     = st.text_area("Comments (optional)", "", height=100)
+    codes = df2[code_col].fillna("").astype(str).str.strip()
+    if desc_col:
+        descs = df2[desc_col].fillna("").astype(str).str.strip()
+        labels = codes.where(descs.eq(""), codes + " - " + descs)
+    else:
+        labels = codes
+    keep = codes.ne("") & ~labels.duplicated()
+    return labels[keep].tolist(), dict(zip(labels[keep], codes[keep]))
+
+@st.cache_data(show_spinner=False)
+def _cost_labels_cached(path: str, mtime: float, code_col):
+    df = _load_lookup_sheet(path, "Cost Codes", ("Cost Code","Cost Code Description","Active"), mtime)
+    return build_cost_labels(_only_active_costcodes(df), code_col)
+
+code_labels, code_map = _cost_labels_cached(xlsx_path, _emp_mtime, cost_code_col)
+
+# Everything below only matters once the user submits, so batch the widgets in a
+# form — edits inside it no longer trigger full-script reruns (and re-reads).
+with st.form("entry_form"):
+    sel_emps = st.multiselect("Employees", emp_opts)
+    sel_area_label = st.selectbox("Job Area", [""] + area_labels)
+    sel_code_label = st.selectbox("Class Type (Cost Code)", [""] + code_labels)
+    rt_hours = st.number_input("RT Hours (per employee)", min_value=0.0, max_value=24.0, step=0.5, value=0.0)
+    ot_hours = st.number_input("OT Hours (per employee)", min_value=0.0, max_value=24.0, step=0.5, value=0.0)
+    desc     = st.text_area("Comments (optional)", "", height=100)
+    submitted = st.form_submit_button("Submit")
 
-def _ensure_time_data_headers(xlsx_file: str):
-    wb = load_workbook(xlsx_file)
-    if "Time Data" not in wb.sheetnames:
-        ws = wb.create_sheet("Time Data")
-        ws.append(["Job Number","Job Area","Date","Name","Class Type","Trade Class","Employee Number",
-                   "RT Hours","OT Hours","Night Shift","Premium Rate / Subsistence Rate / Travel Rate","Comments"])
-        wb.save(xlsx_file); return
-    # ensure common headers exist (non-destructive)
-    ws = wb["Time Data"]
-    headers = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
-    headers = [str(h).strip() if h is not None else "" for h in headers]
-    needed = ["RT Hours","OT Hours","Night Shift","Premium Rate / Subsistence Rate / Travel Rate","Comments"]
-    changed=False
-    for h in needed:
-        if h not in headers:
-            ws.cell(row=1, column=len(headers)+1, value=h); headers.append(h); changed=True
-    if changed: wb.save(xlsx_file)
+sel_area_code = area_map.get(sel_area_label, "")
+sel_code_code = code_map.get(sel_code_label, "")
 
-def _append_row_to_time_data(xlsx_file: str, payload: dict):
+def _append_rows_to_time_data(xlsx_file: str, payloads: List[dict]):
+    # One workbook open/save for the whole batch; the old per-row helper re-parsed
+    # and re-serialized the entire file once per employee. Header checks happen in
+    # the same pass so there's no separate "ensure headers" load either.
+    default_headers = TIME_DATA_COLUMNS
     wb = load_workbook(xlsx_file)
     if "Time Data" not in wb.sheetnames:
         ws = wb.create_sheet("Time Data")
-        ws.append(["Job Number","Job Area","Date","Name","Class Type","Trade Class","Employee Number",
-                   "RT Hours","OT Hours","Night Shift","Premium Rate / Subsistence Rate / Travel Rate","Comments"])
+        ws.append(default_headers)
     ws = wb["Time Data"]
-    headers = [c.value for c in next(ws.iter_rows(min_row=1, max_row=1))]
-    headers = [str(h).strip() if h is not None else "" for h in headers]
+    # values_only avoids instantiating Cell objects just to read the header row
+    headers = [str(h).strip() if h is not None else ""
+               for h in next(ws.iter_rows(min_row=1, max_row=1, values_only=True))]
     if not any(headers):
-        headers = ["Job Number","Job Area","Date","Name","Class Type","Trade Class","Employee Number",
-                   "RT Hours","OT Hours","Night Shift","Premium Rate / Subsistence Rate / Travel Rate","Comments"]
+        headers = list(default_headers)
         for idx, h in enumerate(headers, start=1): ws.cell(row=1, column=idx, value=h)
-    row_vals = [payload.get(h, "") for h in headers]
-    ws.append(row_vals); wb.save(xlsx_file)
+    # ensure common headers exist (non-destructive)
+    for h in ["RT Hours","OT Hours","Night Shift","Premium Rate / Subsistence Rate / Travel Rate","Comments"]:
+        if h not in headers:
+            ws.cell(row=1, column=len(headers)+1, value=h); headers.append(h)
+    for payload in payloads:
+        ws.append([payload.get(h, "") for h in headers])
+    wb.save(xlsx_file)
+
+@st.cache_data(show_spinner=False)
+def _read_time_data_cached(path: str, mtime: float) -> pd.DataFrame:
+    # mtime in the key means appends (which bump the file's mtime) invalidate automatically
+    wanted = set(TIME_DATA_COLUMNS)
+    return _read_sheet(path, "Time Data", TIME_DATA_COLUMNS,
+                       usecols=lambda c: str(c).strip() in wanted)
+
+def _get_time_data_df() -> pd.DataFrame:
+    # In-session copy of the Time Data sheet; avoids re-parsing the workbook on every rerun.
+    df = st.session_state.get("time_data_df")
+    if df is None:
+        try: mtime = os.path.getmtime(xlsx_path)
+        except OSError: mtime = 0.0
+        df = _read_time_data_cached(xlsx_path, mtime)
+        st.session_state["time_data_df"] = df
+    return df
 
-if st.button("Submit"):
+if submitted:
     if not sel_emps:
         st.warning("Select at least one employee.")
     elif not sel_job or not sel_area_code or not sel_code_code:
         st.warning("Select Job, Area, and Class Type.")
     else:
-        try: _ensure_time_data_headers(xlsx_path)
-        except Exception: pass
-        successes = 0
+        # everything except the employee fields is identical across the batch
+        base_payload = {
+            "Job Number": str(sel_job),
+            "Job Area": _pad_job_area(sel_area_code),
+            "Date": date_val.strftime("%Y-%m-%d"),
+            "Class Type": sel_code_code,
+            "RT Hours": float(rt_hours),
+            "OT Hours": float(ot_hours),
+            "Night Shift": "",
+            "Premium Rate / Subsistence Rate / Travel Rate": "",
+            "Comments": desc,
+        }
+        payloads = []
         for emp_name in sel_emps:
-            try:
-                emp_row = employees.loc[employees[emp_name_col].astype(str) == str(emp_name)].iloc[0]
-            except Exception:
+            emp_row = emp_lookup.get(str(emp_name))
+            if emp_row is None:
                 st.error(f"Employee '{emp_name}' not found."); continue
-            payload = {
-                "Job Number": str(sel_job),
-                "Job Area": _pad_job_area(sel_area_code),
-                "Date": date_val.strftime("%Y-%m-%d"),
-                "Name": emp_name,
-                "Class Type": sel_code_code,
-                "Trade Class": emp_row.get(emp_trade_col,""),
-                "Employee Number": emp_row.get(emp_num_col,""),
-                "RT Hours": float(rt_hours),
-                "OT Hours": float(ot_hours),
-                "Night Shift": "",
-                "Premium Rate / Subsistence Rate / Travel Rate": "",
-                "Comments": desc,
-            }
+            payloads.append({**base_payload, "Name": emp_name,
+                             "Trade Class": emp_row["trade"], "Employee Number": emp_row["num"]})
+        if payloads:
             try:
-                _append_row_to_time_data(xlsx_path, payload); successes += 1
+                _append_rows_to_time_data(xlsx_path, payloads)
             except Exception as e:
-                st.error(f"Failed to append row for {emp_name}: {e}")
-        if successes: st.success(f"Added {successes} row(s) to 'Time Data'.")
+                st.error(f"Failed to append rows: {e}")
+            else:
+                # keep the session copy in sync instead of re-reading the sheet we just wrote
+                cached = st.session_state.get("time_data_df")
+                if cached is not None:
+                    st.session_state["time_data_df"] = pd.concat([cached, pd.DataFrame(payloads)], ignore_index=True)
+                st.success(f"Added {len(payloads)} row(s) to 'Time Data'.")
 
 # ---------- What's been added for this day ----------
 st.markdown("---")
 st.subheader("What's been added for this day")
 
-filter_by_job = st.checkbox("Filter by selected Job Number", value=False)
-
-td_all = _read_sheet(xlsx_path, "Time Data", [])
-if not td_all.empty:
-    td_all["__DateStr"] = td_all["Date"].astype(str).str[:10]
-    mask = td_all["__DateStr"] == date_val.strftime("%Y-%m-%d")
-    if filter_by_job and sel_job:
-        mask = mask & (td_all["Job Number"].astype(str).str.strip() == str(sel_job))
-    day_df = td_all[mask].copy()
-else:
-    day_df = pd.DataFrame(columns=["Job Number","Job Area","Date","Name","Class Type","Trade Class","Employee Number",
-                                   "RT Hours","OT Hours","Night Shift","Premium Rate / Subsistence Rate / Travel Rate","Comments"])
-
-if day_df.empty:
-    st.caption("empty")
-else:
+@st.fragment
+def _day_preview(date_val, sel_job):
+    # fragment: the checkbox toggle reruns only this block, not the whole script
+    filter_by_job = st.checkbox("Filter by selected Job Number", value=False)
+
+    td_all = _get_time_data_df()
+    if not td_all.empty:
+        date_str = td_all["Date"].astype(str).str[:10]
+        mask = date_str == date_val.strftime("%Y-%m-%d")
+        if filter_by_job and sel_job:
+            mask = mask & (td_all["Job Number"].astype(str).str.strip() == str(sel_job))
+        day_df = td_all[mask]  # read-only slice; no copy needed
+    else:
+        day_df = pd.DataFrame(columns=TIME_DATA_COLUMNS)
+
+    if day_df.empty:
+        st.caption("empty")
+        return
     show_cols = ["Job Number","Job Area","Date","Name","Class Type","Trade Class","Employee Number","RT Hours","OT Hours","Comments"]
     show_cols = [c for c in show_cols if c in day_df.columns]
-    display_df = day_df.reset_index(drop=True).copy()
+    display_df = day_df.reset_index(drop=True)  # reset_index already allocates a new frame
     display_df.insert(0, "IDX", display_df.index)
+    # Page the view so each rerun only serializes page_size rows to the browser
+    # instead of the whole day's frame.
+    page_size = 50
+    if len(display_df) > page_size:
+        pages = (len(display_df) + page_size - 1) // page_size
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+        st.caption(f"{len(display_df)} rows — page {int(page)} of {pages}")
+        display_df = display_df.iloc[(int(page) - 1) * page_size : int(page) * page_size]
     st.dataframe(display_df[["IDX"] + show_cols], use_container_width=True, hide_index=True)
 
+_day_preview(date_val, sel_job)
+
 # -------------------- EXPORTS --------------------
 st.markdown("---")
 st.subheader("Export Day → TimeEntries + Daily Report")
@@ -298,6 +439,18 @@ with st.form("export_form", clear_on_submit=False):
     export_date = st.date_input("Export Date", dt.date.today())
     do_export = st.form_submit_button("Create Export")
 
+@st.cache_data(show_spinner=False)
+def _template_bytes_cached(path: str, mtime: float) -> bytes:
+    return Path(path).read_bytes()
+
+def _template_bytes() -> bytes:
+    # Cache the export template across export clicks in the session; the mtime key
+    # picks up an edited template without restarting the app.
+    try:
+        return _template_bytes_cached(str(TEMPLATE_EXPORT_BOOK), os.path.getmtime(TEMPLATE_EXPORT_BOOK))
+    except OSError:
+        return None
+
 # ---- Formatting helpers: copy styles from template "TimeEntries" ----
 def clone_row_styles(src_ws: Worksheet, dst_ws: Worksheet, src_row: int, dst_row: int, max_col: int):
     # copy row height
@@ -312,80 +465,93 @@ def clone_row_styles(src_ws: Worksheet, dst_ws: Worksheet, src_row: int, dst_row
         # copy number_format explicitly (sometimes style copy misses it)
         dst_cell.number_format = src_cell.number_format
 
+TIMEENTRIES_HEADERS = ['Date','Time Record Type','Person Number','Employee Name','Override Trade Class','Post To Payroll','Cost Code / Phase','JobArea','Scope Change','Pay Code','Hours','Night Shift','Premium Rate / Subsistence Rate / Travel Rate','Comments']
+
 def build_timeentries_df(sub: pd.DataFrame) -> pd.DataFrame:
-    rows = []
-    for _, r in sub.iterrows():
-        reg_h = float(r.get("RT Hours",0) or 0.0)
-        ot_h  = float(r.get("OT Hours",0) or 0.0)
-        base = {
-            "Date": pd.to_datetime(r.get("Date","")).strftime("%Y-%m-%d"),
-            "Time Record Type": "",
-            "Person Number": r.get("Employee Number",""),
-            "Employee Name": r.get("Name",""),
-            "Override Trade Class": r.get("Trade Class",""),
-            "Post To Payroll": "Y",
-            "Cost Code / Phase": r.get("Class Type",""),
-            "JobArea": _pad_job_area(r.get("Job Area","")),
-            "Scope Change": "",
-            "Pay Code": "",
-            "Hours": 0.0,
-            "Night Shift": "",
-            "Premium Rate / Subsistence Rate / Travel Rate": r.get("Premium Rate / Subsistence Rate / Travel Rate",""),
-            "Comments": "",
-        }
-        if reg_h>0:
-            t=base.copy(); t["Pay Code"]=paycode_map.get("REG","211"); t["Hours"]=reg_h; rows.append(t)
-        if ot_h>0:
-            t=base.copy(); t["Pay Code"]=paycode_map.get("OT","212");  t["Hours"]=ot_h; rows.append(t)
-    HEADERS = ['Date','Time Record Type','Person Number','Employee Name','Override Trade Class','Post To Payroll','Cost Code / Phase','JobArea','Scope Change','Pay Code','Hours','Night Shift','Premium Rate / Subsistence Rate / Travel Rate','Comments']
-    return pd.DataFrame(rows, columns=HEADERS)
-
-def export_per_job_with_template(time_data_df: pd.DataFrame, job: str, export_date: date) -> io.BytesIO:
-    # Build data
-    subset = time_data_df[time_data_df["Job Number"].astype(str).str.strip() == str(job)].copy()
-    out_df = build_timeentries_df(subset)
-
-    # Load external template (beside app)
-    if not TEMPLATE_EXPORT_BOOK.exists():
-        raise RuntimeError("Export template 'TimeEntries.xlsx' not found beside the app.")
-    wb = load_workbook(TEMPLATE_EXPORT_BOOK)
+    # Vectorized REG/OT fan-out: build the shared columns once, slice per pay code,
+    # and concat — no per-row dict copies. sort_index keeps the original row order
+    # (each entry's REG row directly before its OT row).
+    if sub.empty:
+        return pd.DataFrame(columns=TIMEENTRIES_HEADERS)
+    reg_h = pd.to_numeric(sub.get("RT Hours"), errors="coerce").fillna(0.0)
+    ot_h  = pd.to_numeric(sub.get("OT Hours"), errors="coerce").fillna(0.0)
+    blank = pd.Series("", index=sub.index)
+    base = pd.DataFrame({
+        "Date": pd.to_datetime(sub["Date"], errors="coerce").dt.strftime("%Y-%m-%d").fillna(""),
+        "Time Record Type": "",
+        "Person Number": sub.get("Employee Number", blank),
+        "Employee Name": sub.get("Name", blank),
+        "Override Trade Class": sub.get("Trade Class", blank),
+        "Post To Payroll": "Y",
+        "Cost Code / Phase": sub.get("Class Type", blank),
+        "JobArea": pad_job_area_series(sub.get("Job Area", blank)),
+        "Scope Change": "",
+        "Pay Code": "",
+        "Hours": 0.0,
+        "Night Shift": "",
+        "Premium Rate / Subsistence Rate / Travel Rate": sub.get("Premium Rate / Subsistence Rate / Travel Rate", blank),
+        "Comments": "",
+    }, index=sub.index)
+    reg = base[reg_h > 0].assign(**{"Pay Code": PAYCODE_MAP["REG"], "Hours": reg_h[reg_h > 0]})
+    ot  = base[ot_h > 0].assign(**{"Pay Code": PAYCODE_MAP["OT"],  "Hours": ot_h[ot_h > 0]})
+    out = pd.concat([reg, ot]).sort_index(kind="stable").reset_index(drop=True)
+    return out[TIMEENTRIES_HEADERS]
+
+def export_per_job_with_template(job_df: pd.DataFrame, export_date: date, template_bytes: bytes = None) -> bytes:
+    # Build data; job_df is the day's rows for a single job (the caller partitions
+    # the day once with groupby instead of re-filtering the frame per job here)
+    out_df = build_timeentries_df(job_df)
+
+    # Load external template (beside app); callers can pass the bytes once to avoid
+    # re-reading the file from disk for every job in the day.
+    if template_bytes is None:
+        try:
+            template_bytes = TEMPLATE_EXPORT_BOOK.read_bytes()
+        except FileNotFoundError:
+            raise RuntimeError("Export template 'TimeEntries.xlsx' not found beside the app.")
+    wb = load_workbook(io.BytesIO(template_bytes))
     if "TimeEntries" not in wb.sheetnames:
         raise RuntimeError("Template workbook is missing a 'TimeEntries' sheet.")
     ws = wb["TimeEntries"]
 
     # Find header row (assume row 1) and max columns by header
-    headers = [str(c.value).strip() if c.value is not None else "" for c in next(ws.iter_rows(min_row=1, max_row=1))]
+    headers = [str(h).strip() if h is not None else ""
+               for h in next(ws.iter_rows(min_row=1, max_row=1, values_only=True))]
     max_col = len(headers)
 
     # Paste values row-by-row, cloning styles from the first data row (row 2).
     data_start = 2
     has_template_data_row = ws.max_row >= 2
-    for ridx, row in enumerate(out_df.itertuples(index=False), start=data_start):
+    ws_cell = ws.cell  # bind once; the attribute lookup repeats rows x cols times otherwise
+    values = out_df.to_numpy(dtype=object)  # single conversion; no per-row namedtuple construction
+    for ridx, row in enumerate(values, start=data_start):
         if has_template_data_row and ridx != 2:
             clone_row_styles(ws, ws, 2, ridx, max_col)
         for c_idx, val in enumerate(row, start=1):
-            ws.cell(row=ridx, column=c_idx, value=val)
+            ws_cell(row=ridx, column=c_idx, value=val)
 
-    # Blank out any leftover rows below our pasted region (optional)
+    # Drop any leftover rows below our pasted region in one structural op
+    # (cell-by-cell blanking instantiated every trailing cell just to set None)
     last_written = data_start + len(out_df) - 1
     if has_template_data_row and ws.max_row > last_written:
-        for r in range(last_written+1, ws.max_row+1):
-            for c in range(1, max_col+1):
-                ws.cell(row=r, column=c, value=None)
-
-    # Save to bytes
-    buf = io.BytesIO()
-    wb.save(buf); buf.seek(0)
-    return buf
-
-def export_daily_report_populated(xlsx: str, template_path: Path, date_str: str, user: str="") -> io.BytesIO:
-    # Read day subset
-    td = _read_sheet(xlsx, "Time Data", [])
-    if td.empty or "Date" not in td.columns:
-        return None
-    date_col = td["Date"].astype(str).str[:10]
-    day = td[date_col == date_str].copy()
-    if day.empty:
+        ws.delete_rows(last_written+1, ws.max_row - last_written)
+
+    # Save via a temp file so we never hold two in-memory copies of the workbook
+    # (BytesIO + .getvalue() doubled peak memory on large days).
+    with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
+        tmp_path = tmp.name
+    try:
+        wb.save(tmp_path)
+        data = Path(tmp_path).read_bytes()
+    finally:
+        try: os.unlink(tmp_path)
+        except OSError: pass
+    return data
+
+def export_daily_report_populated(day: pd.DataFrame, template_path: Path, date_str: str, user: str="") -> io.BytesIO:
+    # `day` is the already-filtered frame for date_str — the caller has it in hand,
+    # so there's no reason to re-parse the Time Data sheet here.
+    if day is None or day.empty:
         return None
 
     # Load template
@@ -403,30 +569,38 @@ def export_daily_report_populated(xlsx: str, template_path: Path, date_str: str,
     # Group entries for comments per Job Number
     descs = {}
     if "Comments" in day.columns and "Job Number" in day.columns:
-        for job_num in sorted(day["Job Number"].astype(str).str.strip().unique().tolist()):
-            job_comments = day[day["Job Number"].astype(str).str.strip() == job_num]["Comments"].dropna()
-            if not job_comments.empty:
-                texts = job_comments.astype(str).str.strip().replace("nan","").tolist()
-                unique_comments, seen = [], set()
-                for t in texts:
-                    if t and t not in seen:
-                        unique_comments.append(t); seen.add(t)
-                if unique_comments:
-                    descs[str(job_num)] = unique_comments
-
-    # Clear old descriptions (A264:B400) and repopulate
+        # normalize the job key once and partition with groupby, instead of
+        # re-running astype/strip plus a boolean mask for every job
+        job_key = day["Job Number"].astype(str).str.strip()
+        for job_num, grp in day.groupby(job_key, sort=True):
+            texts = grp["Comments"].dropna().astype(str).str.strip()
+            texts = texts[texts.ne("") & texts.ne("nan")]
+            # pd.unique is hash-based and order-preserving, replacing the manual seen-set loop
+            unique_comments = pd.unique(texts).tolist()
+            if unique_comments:
+                descs[str(job_num)] = unique_comments
+
+    # Clear old descriptions (A264:B400) and repopulate. Only touch rows the sheet
+    # actually has, and only cells holding leftover text — the old loop issued 274
+    # positional ws.cell writes (instantiating cells past the end of the sheet)
+    # every export.
     bold_underline_font = Font(bold=True, underline="single")
-    for r in range(264, 401):
-        ws.cell(row=r, column=1, value=None)
-        ws.cell(row=r, column=2, value=None)
+    if ws.max_row >= 264:
+        for row in ws.iter_rows(min_row=264, max_row=min(400, ws.max_row), min_col=1, max_col=2):
+            for c in row:
+                if c.value is not None:
+                    c.value = None
 
+    ws_cell = ws.cell
     row_ptr = 264
     for job_num, comments in descs.items():
-        ws.cell(row=row_ptr, column=1, value="Work Description").font = bold_underline_font
-        ws.cell(row=row_ptr, column=2, value=job_num).font = bold_underline_font
+        # assign the shared Font once per pair of header cells (avoids re-interning styles)
+        a = ws_cell(row=row_ptr, column=1, value="Work Description")
+        b = ws_cell(row=row_ptr, column=2, value=job_num)
+        a.font = b.font = bold_underline_font
         row_ptr += 1
         for comment in comments:
-            ws.cell(row=row_ptr, column=2, value=comment)
+            ws_cell(row=row_ptr, column=2, value=comment)
             row_ptr += 1
         row_ptr += 1  # blank spacer
 
@@ -451,26 +625,27 @@ def offer_download_and_sharepoint(file_name: str, file_bytes: bytes, month_folde
 
 # -------------------- EXPORT BUTTON --------------------
 if do_export:
-    # Pull rows for day
-    td = _read_sheet(xlsx_path, "Time Data", [])
+    # Pull rows for day (reuse the session frame already loaded for the preview)
+    td = _get_time_data_df()
     if td.empty or "Date" not in td.columns:
-        st.warning("No matching rows for that date."); 
+        st.warning("No matching rows for that date.");
     else:
         dmask = td["Date"].astype(str).str[:10] == export_date.strftime("%Y-%m-%d")
-        day_df = td[dmask].copy()
+        day_df = td[dmask]
         if day_df.empty:
             st.warning("No matching rows for that date.")
         else:
             month_folder = export_date.strftime("%B")
 
             # (A) Per‑job TimeEntries exports (using external template)
-            jobs_for_day = sorted(day_df["Job Number"].astype(str).str.strip().unique().tolist())
+            job_key = day_df["Job Number"].astype(str).str.strip()
+            template_bytes = _template_bytes()
             n_files = 0
-            for job in jobs_for_day:
+            for job, job_df in day_df.groupby(job_key, sort=True):
                 try:
-                    buf = export_per_job_with_template(day_df, job, export_date)
+                    data = export_per_job_with_template(job_df, export_date, template_bytes)
                     file_name = f"{export_date.strftime('%m-%d-%Y')} - {job} - Daily Time Import.xlsx"
-                    offer_download_and_sharepoint(file_name, buf.getvalue(), month_folder)
+                    offer_download_and_sharepoint(file_name, data, month_folder)
                     n_files += 1
                 except Exception as e:
                     st.error(f"Failed to create job export for {job}: {e}")
@@ -483,7 +658,7 @@ if do_export:
                 st.warning("Template 'Daily Time.xlsx' not found beside the app.")
             else:
                 try:
-                    out2 = export_daily_report_populated(xlsx_path, DAILY_TEMPLATE_BOOK, export_date.strftime("%Y-%m-%d"), st.session_state.get("whoami_email",""))
+                    out2 = export_daily_report_populated(day_df, DAILY_TEMPLATE_BOOK, export_date.strftime("%Y-%m-%d"), st.session_state.get("whoami_email",""))
                     if out2 is not None:
                         daily_name = f"{export_date.strftime('%m-%d-%Y')} – Daily Time.xlsx"
                         offer_download_and_sharepoint(daily_name, out2.getvalue(), month_folder)